@@ -1,13 +1,34 @@
+import asyncio
+import functools
 import os
 import logging
 import random
 import re
-import google.generativeai as genai
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup, ParseMode, Update
-from telegram.ext import Updater, CommandHandler, CallbackQueryHandler, CallbackContext
-from telegram.error import BadRequest
+import time
+from collections import deque
+from cachetools import TTLCache
+import httpx
+from google import genai
+from google.genai import types
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram.constants import ParseMode
+from telegram.ext import AIORateLimiter, Application, CommandHandler, CallbackQueryHandler, ContextTypes
+from telegram.error import BadRequest, TelegramError
+from telegram.request import HTTPXRequest
 from dotenv import load_dotenv
 
+try:
+  # uvloop is a faster drop-in event loop; it is not available on Windows.
+  import uvloop
+except ImportError:
+  uvloop = None
+
+try:
+  # orjson parses Telegram's JSON responses faster than the stdlib json.
+  import orjson
+except ImportError:
+  orjson = None
+
 # --- Configuration ---
 # Load environment variables from a .env file for local development
 load_dotenv()
@@ -25,26 +46,122 @@ logger = logging.getLogger(__name__)
 
 
 # --- Helper Function for MarkdownV2 ---
+# Characters to escape: _ * [ ] ( ) ~ ` > # + - = | { } . !
+# Built once at import; str.translate does the escaping in a single C pass.
+_MD2_ESCAPE_CHARS = r'_*[]()~`>#+-=|{}.!'
+_MD2_TRANS = str.maketrans({c: '\\' + c for c in _MD2_ESCAPE_CHARS})
+
+
 def escape_markdown_v2(text: str) -> str:
   """
     Escapes characters for Telegram's MarkdownV2 parse mode.
     This is a crucial fix to prevent Telegram API errors.
     """
-  # Characters to escape: _ * [ ] ( ) ~ ` > # + - = | { } . !
-  escape_chars = r'_*[]()~`>#+-=|{}.!'
-  return re.sub(f'([{re.escape(escape_chars)}])', r'\\\1', text)
+  return text.translate(_MD2_TRANS)
+
+
+# Same as _MD2_TRANS but leaves * and _ alone, for text whose bold and italic
+# markup should still be rendered.
+_MD2_KEEP_FORMATTING_TRANS = str.maketrans(
+    {c: '\\' + c for c in _MD2_ESCAPE_CHARS if c not in '*_'})
+
+
+def escape_markdown_v2_keep_formatting(text: str) -> str:
+  """
+    Escapes text for MarkdownV2 except for the * and _ formatting characters.
+    """
+  return text.translate(_MD2_KEEP_FORMATTING_TRANS)
 
 
 # --- AI Configuration ---
+GEMINI_MODEL = 'gemini-2.5-flash'
+
 try:
   # Configure Gemini AI
-  genai.configure(api_key=GEMINI_API_KEY)
-  # FIX: Corrected the model name. 'gemini-2.5-flash' is not a valid model.
-  # Using 'gemini-1.5-flash-latest' for the best performance.
-  model = genai.GenerativeModel('gemini-2.5-flash')
+  # A single client is shared by every request. Its async httpx transport
+  # keeps HTTP/2 connections alive, so calls after the first one skip the
+  # TCP and TLS handshakes. Passing an explicit transport also keeps
+  # google-genai on httpx when aiohttp happens to be installed.
+  client = genai.Client(
+      api_key=GEMINI_API_KEY,
+      http_options=types.HttpOptions(
+          timeout=30000,  # milliseconds
+          async_client_args={
+              'transport':
+              httpx.AsyncHTTPTransport(
+                  http2=True,
+                  limits=httpx.Limits(max_keepalive_connections=32)),
+          }))
 except Exception as e:
   logger.error(f"Failed to configure Gemini AI: {e}")
-  model = None
+  client = None
+
+# --- Idea Cache ---
+# Recently generated ideas are kept per category so that repeated button
+# presses can be served without a Gemini round-trip. Entries are
+# (timestamp, text) tuples stored oldest first.
+IDEA_CACHE_SIZE = 20
+IDEA_CACHE_TTL = 3600  # seconds
+IDEA_CACHE_HIT_RATE = 0.3
+
+_IDEA_CACHE: dict[str, deque] = {}
+
+
+def _get_cached_idea(category_name: str):
+  """Return a recent cached idea for the category, or None on a miss."""
+  cache = _IDEA_CACHE.get(category_name)
+  if not cache:
+    return None
+  expiry = time.monotonic() - IDEA_CACHE_TTL
+  while cache and cache[0][0] < expiry:
+    cache.popleft()
+  if not cache or random.random() >= IDEA_CACHE_HIT_RATE:
+    return None
+  return random.choice(cache)[1]
+
+
+def _store_idea(category_name: str, text: str):
+  """Remember a freshly generated idea for the category."""
+  cache = _IDEA_CACHE.get(category_name)
+  if cache is None:
+    cache = _IDEA_CACHE[category_name] = deque(maxlen=IDEA_CACHE_SIZE)
+  cache.append((time.monotonic(), text))
+
+
+# Gemini requests currently running, by category. Callers asking for the same
+# category while one is pending await its future instead of issuing their
+# own request, which also caps concurrent Gemini calls at one per category.
+_inflight_ideas: dict[str, asyncio.Future] = {}
+
+
+class _IdeaRequestAbandoned(Exception):
+  """Set on a shared idea future when the request behind it was cancelled."""
+
+
+# Minimum delay between progressive edits while a Gemini response streams in.
+# Telegram allows roughly one edit per second per chat.
+STREAM_EDIT_INTERVAL = 1.5  # seconds
+
+# --- Button Debounce ---
+# Messages whose buttons were pressed recently, keyed by (chat_id, message_id)
+# or inline_message_id. Repeated presses inside the window are ignored so a
+# double tap does not start a second Gemini request and a racing edit.
+PRESS_DEBOUNCE_SECONDS = 1.5
+
+_recent_presses = TTLCache(maxsize=10000, ttl=PRESS_DEBOUNCE_SECONDS)
+
+
+def _is_repeated_press(query) -> bool:
+  """Record a button press and report whether its message was just pressed."""
+  if query.message:
+    key = (query.message.chat_id, query.message.message_id)
+  else:
+    key = query.inline_message_id
+  if key in _recent_presses:
+    return True
+  _recent_presses[key] = True
+  return False
+
 
 # --- Bot Content ---
 BUSINESS_CATEGORIES = {
@@ -61,19 +178,13 @@ BUSINESS_CATEGORIES = {
     "entertainment": "🎬 Entertainment & Media",
     "travel": "✈️ Travel & Tourism"
 }
+_CATEGORY_KEYS = tuple(BUSINESS_CATEGORIES)
 
-
-# --- Bot Class ---
-class BusinessIdeaBot:
-
-  def __init__(self):
-    self.updater = None
-
-  def start(self, update: Update, context: CallbackContext):
-    """Start command handler"""
-    # FIX: Escaped the message to be compatible with MarkdownV2
-    welcome_message = escape_markdown_v2(
-        """🚀 *Welcome to Business Ideas Generator Bot!*
+# --- Pre-rendered Messages ---
+# These messages never change, so they are escaped once at import instead of
+# on every handler call. Their bold markup is left unescaped.
+_WELCOME_MSG = escape_markdown_v2_keep_formatting(
+    """🚀 *Welcome to Business Ideas Generator Bot!*
 
 I can help you generate innovative business ideas across various categories using AI.
 
@@ -90,55 +201,275 @@ I can help you generate innovative business ideas across various categories usin
 
 Let's start your entrepreneurial journey! 🎯""")
 
-    keyboard = [[
+_CATEGORIES_HEADER = escape_markdown_v2_keep_formatting(
+    "🏢 *Choose a Business Category:*\n\nSelect a category to get tailored business ideas:"
+)
+
+_HELP_MSG = escape_markdown_v2_keep_formatting("""📘 *Help & Information*
+
+*What is this bot?*
+This bot generates innovative business ideas using Google's Gemini AI across various categories.
+
+*Available Commands:*
+• /start - Main menu and welcome
+• /categories - Browse all business categories
+• /random - Get a random business idea
+• /help - Show this help message
+
+*How it works:*
+1. Choose a business category or get a random idea
+2. The bot uses AI to generate detailed business concepts
+3. Each idea includes market analysis, revenue models, and startup steps
+
+*Support:*
+For issues or feedback, please contact the developer.
+""")
+
+_BACK_MSG = escape_markdown_v2_keep_formatting("""🚀 *Business Ideas Generator Bot*
+
+Ready to discover your next business opportunity?
+
+*What would you like to do?*""")
+
+_ERROR_MSG = escape_markdown_v2_keep_formatting(
+    "❌ *An error occurred*\n\nSorry, something went wrong. Please try again or use /start to return to the main menu."
+)
+
+
+def _render_loading_msg(category_name: str) -> str:
+  """Render the status message shown while a category idea is generated."""
+  return f"🔄 *Generating business idea for {escape_markdown_v2(category_name)}\\.\\.\\.*\n\nPlease wait while I create an innovative business concept for you\\!"
+
+
+def _render_random_loading_msg(category_name: str) -> str:
+  """Render the status message shown while a random idea is generated."""
+  return f"🎲 *Generating random business idea\\.\\.\\.*\n\n_Category: {escape_markdown_v2(category_name)}_\n\nPlease wait\\!"
+
+
+# Loading messages only vary by category, so every variant is rendered here.
+_LOADING_MSGS = {
+    key: _render_loading_msg(name)
+    for key, name in BUSINESS_CATEGORIES.items()
+}
+_RANDOM_LOADING_MSGS = {
+    key: _render_random_loading_msg(name)
+    for key, name in BUSINESS_CATEGORIES.items()
+}
+
+# --- Static Keyboards ---
+_MAIN_MENU_MARKUP = InlineKeyboardMarkup([
+    [
         InlineKeyboardButton("📋 Browse Categories",
                              callback_data="show_categories")
-    ], [InlineKeyboardButton("🎲 Random Idea", callback_data="random_idea")],
-                [InlineKeyboardButton("❓ Help", callback_data="help")]]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    ],
+    [InlineKeyboardButton("🎲 Random Idea", callback_data="random_idea")],
+    [InlineKeyboardButton("❓ Help", callback_data="help")],
+])
 
-    # Unescape the specific characters we want to be rendered as markdown
-    welcome_message = welcome_message.replace("\\*", "*").replace("\\•", "•")
+_HELP_MARKUP = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("📋 Browse Categories",
+                             callback_data="show_categories")
+    ],
+    [InlineKeyboardButton("🏠 Main Menu", callback_data="back_to_start")],
+])
+
+
+def _build_categories_markup() -> InlineKeyboardMarkup:
+  """Build the category picker keyboard, two categories per row."""
+  keyboard = []
+  categories_list = tuple(BUSINESS_CATEGORIES.items())
+  for i in range(0, len(categories_list), 2):
+    row = []
+    for j in range(i, min(i + 2, len(categories_list))):
+      key, value = categories_list[j]
+      row.append(InlineKeyboardButton(value, callback_data=f"category_{key}"))
+    keyboard.append(row)
+
+  keyboard.append([
+      InlineKeyboardButton("🔙 Back to Menu", callback_data="back_to_start")
+  ])
+  return InlineKeyboardMarkup(keyboard)
+
+
+def _build_category_result_markup(category_key: str) -> InlineKeyboardMarkup:
+  """Build the keyboard shown under an idea generated for a category."""
+  return InlineKeyboardMarkup([
+      [
+          InlineKeyboardButton("🔄 Generate Another",
+                               callback_data=f"category_{category_key}")
+      ],
+      [
+          InlineKeyboardButton("📋 All Categories",
+                               callback_data="show_categories")
+      ],
+      [InlineKeyboardButton("🏠 Main Menu", callback_data="back_to_start")],
+  ])
 
-    update.message.reply_text(welcome_message,
-                              parse_mode=ParseMode.MARKDOWN_V2,
-                              reply_markup=reply_markup)
 
-  def show_categories(self, update: Update, context: CallbackContext):
-    """Show business categories"""
-    message = escape_markdown_v2(
-        "🏢 *Choose a Business Category:*\n\nSelect a category to get tailored business ideas:"
+_CATEGORIES_KEYBOARD = _build_categories_markup()
+
+_RANDOM_RESULT_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🎲 Another Random", callback_data="random_idea")],
+    [
+        InlineKeyboardButton("📋 Browse Categories",
+                             callback_data="show_categories")
+    ],
+    [InlineKeyboardButton("🏠 Main Menu", callback_data="back_to_start")],
+])
+
+_CATEGORY_RESULT_MARKUP = {
+    key: _build_category_result_markup(key)
+    for key in BUSINESS_CATEGORIES
+}
+
+
+def _get_result_markup(category_key: str, is_random: bool):
+  """Return the keyboard shown under a generated idea."""
+  if is_random:
+    return _RANDOM_RESULT_MARKUP
+  reply_markup = _CATEGORY_RESULT_MARKUP.get(category_key)
+  if reply_markup is None:
+    reply_markup = _build_category_result_markup(category_key)
+  return reply_markup
+
+
+# --- Idea Delivery ---
+async def _show_partial_idea(edit, partial_idea: str):
+  """Show a partially streamed idea by calling edit(text)."""
+  # Partial output may contain unbalanced markdown, so progress edits are
+  # sent as plain text. The final message applies the formatting. Progress
+  # is best-effort, so any Telegram error is logged and dropped.
+  try:
+    await edit(partial_idea)
+  except TelegramError as e:
+    if "message is not modified" not in str(e).lower():
+      logger.warning(f"Could not show partial idea: {e}")
+
+
+async def _send_idea(send, business_idea: str, reply_markup):
+  """Send the finished idea with send(text, ...), falling back to plain text."""
+  # FIX: Add robust error handling for sending the AI-generated message.
+  # Sometimes the AI output can have broken markdown. This prevents a crash.
+  try:
+    await send(business_idea,
+               parse_mode=ParseMode.MARKDOWN_V2,
+               reply_markup=reply_markup)
+  except BadRequest as e:
+    if "Can't parse entities" not in str(e):
+      logger.error(f"Telegram API error when sending idea: {e}")
+      raise
+    logger.warning(
+        f"Could not parse AI-generated markdown. Sending as plain text. Error: {e}"
     )
-    message = message.replace("\\*", "*")  # Keep the bold formatting
-
-    keyboard = []
-    categories_list = list(BUSINESS_CATEGORIES.items())
-    for i in range(0, len(categories_list), 2):
-      row = []
-      for j in range(i, min(i + 2, len(categories_list))):
-        key, value = categories_list[j]
-        row.append(InlineKeyboardButton(value,
-                                        callback_data=f"category_{key}"))
-      keyboard.append(row)
-
-    keyboard.append([
-        InlineKeyboardButton("🔙 Back to Menu", callback_data="back_to_start")
-    ])
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    # Without a parse mode nothing needs escaping, so the idea is sent
+    # as-is instead of paying for another pass over the whole text.
+    await send(business_idea, reply_markup=reply_markup)
+
+
+# --- Telegram Requests ---
+# Times a request that hit Telegram's flood control (HTTP 429) is retried.
+TELEGRAM_MAX_RETRIES = 3
+
+
+class OrjsonHTTPXRequest(HTTPXRequest):
+  """HTTPXRequest that decodes Telegram API responses with orjson."""
+
+  @staticmethod
+  def parse_json_payload(payload: bytes) -> dict:
+    try:
+      return orjson.loads(payload)
+    except orjson.JSONDecodeError as exc:
+      raise TelegramError("Invalid server response") from exc
+
+
+# --- Callback Routing ---
+# Callback data of the fixed menu buttons, mapped to the BusinessIdeaBot
+# method that handles each one. Both the route map and _ROUTE_RE are built
+# from this table.
+_MENU_ROUTES = {
+    "show_categories": "show_categories",
+    "random_idea": "random_business_idea",
+    "help": "show_help",
+    "back_to_start": "back_to_start",
+}
+
+# Decodes any valid callback data in one match: either a fixed menu route
+# or a category button with its key.
+_ROUTE_RE = re.compile(r'^(?:(?P<cmd>%s)|category_(?P<cat>[a-z]+))$' %
+                       '|'.join(map(re.escape, _MENU_ROUTES)))
+
+
+# --- Bot Class ---
+class BusinessIdeaBot:
+
+  def __init__(self):
+    self.application = None
+    # Menu route handlers, bound once per bot instead of on every callback
+    # query.
+    self.route_map = {
+        route: getattr(self, method_name)
+        for route, method_name in _MENU_ROUTES.items()
+    }
+
+  async def start(self, update: Update,
+                  context: ContextTypes.DEFAULT_TYPE):
+    """Start command handler"""
+    await update.message.reply_text(_WELCOME_MSG,
+                                    parse_mode=ParseMode.MARKDOWN_V2,
+                                    reply_markup=_MAIN_MENU_MARKUP)
 
+  async def show_categories(self, update: Update,
+                            context: ContextTypes.DEFAULT_TYPE):
+    """Show business categories"""
     # Use query attribute for callback queries
     query = update.callback_query
     if query:
-      query.edit_message_text(message,
-                              parse_mode=ParseMode.MARKDOWN_V2,
-                              reply_markup=reply_markup)
+      await query.edit_message_text(_CATEGORIES_HEADER,
+                                    parse_mode=ParseMode.MARKDOWN_V2,
+                                    reply_markup=_CATEGORIES_KEYBOARD)
     else:
-      update.message.reply_text(message,
-                                parse_mode=ParseMode.MARKDOWN_V2,
-                                reply_markup=reply_markup)
+      await update.message.reply_text(_CATEGORIES_HEADER,
+                                      parse_mode=ParseMode.MARKDOWN_V2,
+                                      reply_markup=_CATEGORIES_KEYBOARD)
 
-  def generate_business_idea(self, category_name: str):
-    """Generate business idea using Gemini AI"""
+  async def generate_business_idea(self, category_name: str, on_progress=None):
+    """
+        Generate business idea using Gemini AI.
+        If on_progress is given, it is awaited with the text received so far
+        while the response streams in, at most once every STREAM_EDIT_INTERVAL.
+        """
+    cached_idea = _get_cached_idea(category_name)
+    if cached_idea is not None:
+      return cached_idea
+
+    while (pending := _inflight_ideas.get(category_name)) is not None:
+      # Another user is already waiting on this category; share their result.
+      # shield() keeps this caller's cancellation from cancelling theirs.
+      try:
+        return await asyncio.shield(pending)
+      except _IdeaRequestAbandoned:
+        # Their handler was cancelled; check for a newer request or make our
+        # own.
+        pass
+
+    pending = asyncio.get_running_loop().create_future()
+    _inflight_ideas[category_name] = pending
+    try:
+      business_idea = await self._request_business_idea(
+          category_name, on_progress)
+      pending.set_result(business_idea)
+      return business_idea
+    finally:
+      if not pending.done():
+        pending.set_exception(_IdeaRequestAbandoned())
+        # Mark the exception as retrieved so asyncio does not log it when
+        # nobody else was waiting.
+        pending.exception()
+      del _inflight_ideas[category_name]
+
+  async def _request_business_idea(self, category_name: str, on_progress):
+    """Stream a new business idea from Gemini, bypassing all caches."""
     prompt = f"""Generate a comprehensive and innovative business idea for the '{category_name}' category.
 
 Please format your response with the following structure using markdown (use * for bold, not #):
@@ -176,240 +507,173 @@ Ensure the idea is:
 - Formatted with proper markdown for Telegram.
 """
     try:
-      if not model:
-        raise Exception("Gemini AI model is not initialized.")
-      response = model.generate_content(prompt)
-      return response.text
+      if not client:
+        raise Exception("Gemini AI client is not initialized.")
+      response = await client.aio.models.generate_content_stream(
+          model=GEMINI_MODEL, contents=prompt)
+      chunks = []
+      progress_task = None
+      last_progress = time.monotonic()
+      try:
+        async for chunk in response:
+          if chunk.text:
+            chunks.append(chunk.text)
+          now = time.monotonic()
+          # Progress edits run in the background so the rate limiter never
+          # stalls the stream. While one is still pending, newer text is
+          # coalesced into the next edit instead of queueing another.
+          if (on_progress and now - last_progress >= STREAM_EDIT_INTERVAL and
+              (progress_task is None or progress_task.done())):
+            last_progress = now
+            progress_task = asyncio.create_task(on_progress("".join(chunks)))
+      finally:
+        # Let a pending progress edit finish rather than cancelling it: a
+        # request already sent could otherwise land after the final message
+        # and replace it, keyboard included.
+        if progress_task is not None:
+          await progress_task
+      business_idea = "".join(chunks)
+      if not business_idea:
+        # google-genai yields chunks without text for blocked or filtered
+        # responses instead of raising.
+        raise Exception("Gemini returned no text for this request.")
+      _store_idea(category_name, business_idea)
+      return business_idea
     except Exception as e:
       logger.error(f"Error generating business idea: {e}")
-      error_text = f"""*❌ Error Generating Idea*
+      return f"""*❌ Error Generating Idea*
 
-Sorry, I encountered an error while generating a business idea for *{escape_markdown_v2(category_name)}*.
+Sorry, I encountered an error while generating a business idea for *{escape_markdown_v2(category_name)}*\\.
 
-Please try again later or contact support if the issue persists.
+Please try again later or contact support if the issue persists\\.
 
 *Error Details:* `{escape_markdown_v2(str(e))}`"""
-      return error_text.replace("\\*", "*")  # Keep bold formatting for titles
 
-  def handle_category_selection(self, update: Update,
-                                context: CallbackContext):
+  async def handle_category_selection(self, update: Update,
+                                      context: ContextTypes.DEFAULT_TYPE,
+                                      category_key: str):
     """Handle category selection from a button press."""
     query = update.callback_query
-    query.answer()
+    if _is_repeated_press(query):
+      await query.answer("Please wait...")
+      return
+    await query.answer()
 
-    category_key = query.data.replace("category_", "")
     category_name = BUSINESS_CATEGORIES.get(category_key, "Unknown Category")
 
-    loading_message_text = f"🔄 *Generating business idea for {escape_markdown_v2(category_name)}\\.\\.\\.*\n\nPlease wait while I create an innovative business concept for you\\!"
-    loading_message_text = loading_message_text.replace("\\*", "*")
-    query.edit_message_text(loading_message_text,
-                            parse_mode=ParseMode.MARKDOWN_V2)
+    loading_message_text = _LOADING_MSGS.get(category_key)
+    if loading_message_text is None:
+      loading_message_text = _render_loading_msg(category_name)
+    await query.edit_message_text(loading_message_text,
+                                  parse_mode=ParseMode.MARKDOWN_V2)
 
-    self._generate_and_send_idea(query, context, category_key, category_name)
+    await self._send_idea_from_query(query, category_key, category_name)
 
-  def random_business_idea(self, update: Update, context: CallbackContext):
+  async def random_business_idea(self, update: Update,
+                                 context: ContextTypes.DEFAULT_TYPE):
     """Generate a random business idea, works for both command and button."""
-    category_key = random.choice(list(BUSINESS_CATEGORIES.keys()))
+    query = update.callback_query
+    if query and _is_repeated_press(query):
+      await query.answer("Please wait...")
+      return
+
+    category_key = random.choice(_CATEGORY_KEYS)
     category_name = BUSINESS_CATEGORIES[category_key]
 
-    query = update.callback_query
     if query:
-      query.answer()
-      loading_message_text = f"🎲 *Generating random business idea\\.\\.\\.*\n\n_Category: {escape_markdown_v2(category_name)}_\n\nPlease wait\\!"
-      loading_message_text = loading_message_text.replace("\\*", "*").replace(
-          "\\_", "_")
-      query.edit_message_text(loading_message_text,
-                              parse_mode=ParseMode.MARKDOWN_V2)
-      self._generate_and_send_idea(query,
-                                   context,
-                                   category_key,
-                                   category_name,
-                                   is_random=True)
+      await query.answer()
+      loading_message_text = _RANDOM_LOADING_MSGS[category_key]
+      await query.edit_message_text(loading_message_text,
+                                    parse_mode=ParseMode.MARKDOWN_V2)
+      await self._send_idea_from_query(query,
+                                       category_key,
+                                       category_name,
+                                       is_random=True)
     else:
       # This handles the /random command
-      loading_message_text = f"🎲 *Generating random business idea\\.\\.\\.*\n\n_Category: {escape_markdown_v2(category_name)}_\n\nPlease wait\\!"
-      loading_message_text = loading_message_text.replace("\\*", "*").replace(
-          "\\_", "_")
-      msg = update.message.reply_text(loading_message_text,
-                                      parse_mode=ParseMode.MARKDOWN_V2)
-      self._generate_and_send_idea(update,
-                                   context,
-                                   category_key,
-                                   category_name,
-                                   is_random=True,
-                                   loading_msg_id=msg.message_id)
-
-  def _generate_and_send_idea(self,
-                              update_or_query,
-                              context: CallbackContext,
-                              category_key: str,
-                              category_name: str,
-                              is_random=False,
-                              loading_msg_id=None):
-    """A helper function to generate and send the idea to avoid code duplication."""
-    business_idea = self.generate_business_idea(category_name)
-
-    # Define keyboard based on context
-    if is_random:
-      keyboard = [[
-          InlineKeyboardButton("🎲 Another Random", callback_data="random_idea")
-      ],
-                  [
-                      InlineKeyboardButton("📋 Browse Categories",
-                                           callback_data="show_categories")
-                  ],
-                  [
-                      InlineKeyboardButton("🏠 Main Menu",
-                                           callback_data="back_to_start")
-                  ]]
-    else:
-      keyboard = [[
-          InlineKeyboardButton("🔄 Generate Another",
-                               callback_data=f"category_{category_key}")
-      ],
-                  [
-                      InlineKeyboardButton("📋 All Categories",
-                                           callback_data="show_categories")
-                  ],
-                  [
-                      InlineKeyboardButton("🏠 Main Menu",
-                                           callback_data="back_to_start")
-                  ]]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
-    # Determine how to send the message (edit existing or send new)
-    is_query = hasattr(update_or_query,
-                       'message') and update_or_query.message is not None
-    chat_id = update_or_query.message.chat_id if is_query else update_or_query.effective_chat.id
-
-    # Delete the "loading" message if it was sent via a command
-    if loading_msg_id:
-      try:
-        context.bot.delete_message(chat_id=chat_id, message_id=loading_msg_id)
-      except BadRequest as e:
-        logger.warning(f"Could not delete loading message: {e}")
-
-    # FIX: Add robust error handling for sending the AI-generated message.
-    # Sometimes the AI output can have broken markdown. This prevents a crash.
-    try:
-      if is_query:
-        update_or_query.edit_message_text(business_idea,
-                                          parse_mode=ParseMode.MARKDOWN_V2,
-                                          reply_markup=reply_markup)
-      else:  # Sent from a command like /random
-        context.bot.send_message(chat_id,
-                                 business_idea,
-                                 parse_mode=ParseMode.MARKDOWN_V2,
-                                 reply_markup=reply_markup)
-    except BadRequest as e:
-      if "Can't parse entities" in str(e):
-        logger.warning(
-            f"Could not parse AI-generated markdown. Sending as plain text. Error: {e}"
-        )
-        plain_text_idea = escape_markdown_v2(business_idea)
-        if is_query:
-          update_or_query.edit_message_text(plain_text_idea,
-                                            reply_markup=reply_markup)
-        else:
-          context.bot.send_message(chat_id,
-                                   plain_text_idea,
-                                   reply_markup=reply_markup)
-      else:
-        logger.error(f"Telegram API error when sending idea: {e}")
-        self.error_handler(update_or_query, context)
-
-  def show_help(self, update: Update, context: CallbackContext):
+      loading_message_text = _RANDOM_LOADING_MSGS[category_key]
+      msg = await update.message.reply_text(loading_message_text,
+                                            parse_mode=ParseMode.MARKDOWN_V2)
+      await self._send_idea_from_command(update,
+                                         context,
+                                         category_name,
+                                         loading_msg_id=msg.message_id)
+
+  async def _send_idea_from_query(self,
+                                  query,
+                                  category_key: str,
+                                  category_name: str,
+                                  is_random=False):
+    """Generate an idea and show it in place of the pressed button's message."""
+    business_idea = await self.generate_business_idea(
+        category_name,
+        on_progress=functools.partial(_show_partial_idea,
+                                      query.edit_message_text))
+    await _send_idea(query.edit_message_text, business_idea,
+                     _get_result_markup(category_key, is_random))
+
+  async def _send_idea_from_command(self,
+                                    update: Update,
+                                    context: ContextTypes.DEFAULT_TYPE,
+                                    category_name: str,
+                                    loading_msg_id: int):
+    """Generate an idea for /random and show it in its loading message."""
+    edit_loading_msg = functools.partial(context.bot.edit_message_text,
+                                         chat_id=update.effective_chat.id,
+                                         message_id=loading_msg_id)
+    business_idea = await self.generate_business_idea(
+        category_name,
+        on_progress=functools.partial(_show_partial_idea, edit_loading_msg))
+    # The loading message is reused for the idea instead of being deleted
+    # and replaced, saving a Telegram API round-trip.
+    await _send_idea(edit_loading_msg, business_idea, _RANDOM_RESULT_MARKUP)
+
+  async def show_help(self, update: Update,
+                      context: ContextTypes.DEFAULT_TYPE):
     """Show help information"""
-    help_text = escape_markdown_v2("""📘 *Help & Information*
-
-*What is this bot?*
-This bot generates innovative business ideas using Google's Gemini AI across various categories.
-
-*Available Commands:*
-• /start - Main menu and welcome
-• /categories - Browse all business categories
-• /random - Get a random business idea
-• /help - Show this help message
-
-*How it works:*
-1. Choose a business category or get a random idea
-2. The bot uses AI to generate detailed business concepts
-3. Each idea includes market analysis, revenue models, and startup steps
-
-*Support:*
-For issues or feedback, please contact the developer.
-""")
-    # Re-enable the markdown we want
-    help_text = help_text.replace("\\*", "*").replace("\\•", "•")
-
-    keyboard = [[
-        InlineKeyboardButton("📋 Browse Categories",
-                             callback_data="show_categories")
-    ], [InlineKeyboardButton("🏠 Main Menu", callback_data="back_to_start")]]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
     query = update.callback_query
     if query:
-      query.edit_message_text(help_text,
-                              parse_mode=ParseMode.MARKDOWN_V2,
-                              reply_markup=reply_markup)
+      await query.edit_message_text(_HELP_MSG,
+                                    parse_mode=ParseMode.MARKDOWN_V2,
+                                    reply_markup=_HELP_MARKUP)
     else:
-      update.message.reply_text(help_text,
-                                parse_mode=ParseMode.MARKDOWN_V2,
-                                reply_markup=reply_markup)
+      await update.message.reply_text(_HELP_MSG,
+                                      parse_mode=ParseMode.MARKDOWN_V2,
+                                      reply_markup=_HELP_MARKUP)
 
-  def back_to_start(self, update: Update, context: CallbackContext):
+  async def back_to_start(self, update: Update,
+                          context: ContextTypes.DEFAULT_TYPE):
     """Go back to start menu"""
     query = update.callback_query
-    query.answer()
-
-    welcome_message = escape_markdown_v2("""🚀 *Business Ideas Generator Bot*
-
-Ready to discover your next business opportunity?
-
-*What would you like to do?*""")
-    welcome_message = welcome_message.replace("\\*", "*")
-
-    keyboard = [[
-        InlineKeyboardButton("📋 Browse Categories",
-                             callback_data="show_categories")
-    ], [InlineKeyboardButton("🎲 Random Idea", callback_data="random_idea")],
-                [InlineKeyboardButton("❓ Help", callback_data="help")]]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    await query.answer()
 
-    query.edit_message_text(welcome_message,
-                            parse_mode=ParseMode.MARKDOWN_V2,
-                            reply_markup=reply_markup)
+    await query.edit_message_text(_BACK_MSG,
+                                  parse_mode=ParseMode.MARKDOWN_V2,
+                                  reply_markup=_MAIN_MENU_MARKUP)
 
-  def callback_query_handler(self, update: Update, context: CallbackContext):
+  async def callback_query_handler(self, update: Update,
+                                   context: ContextTypes.DEFAULT_TYPE):
     """Handle all callback queries in one place."""
     query = update.callback_query
 
-    route_map = {
-        "show_categories": self.show_categories,
-        "random_idea": self.random_business_idea,
-        "help": self.show_help,
-        "back_to_start": self.back_to_start,
-    }
-
-    if query.data in route_map:
-      route_map[query.data](update, context)
-    elif query.data.startswith("category_"):
-      self.handle_category_selection(update, context)
+    # Unknown callback data is ignored.
+    match = _ROUTE_RE.match(query.data)
+    if match is None:
+      return
+    if match['cmd']:
+      await self.route_map[match['cmd']](update, context)
+    else:
+      await self.handle_category_selection(update, context, match['cat'])
 
-  def error_handler(self, update, context: CallbackContext):
+  async def error_handler(self, update, context: ContextTypes.DEFAULT_TYPE):
     """Log errors and send a user-friendly message."""
     logger.error(f"Update {update} caused error {context.error}",
                  exc_info=context.error)
 
     if update and update.effective_message:
       try:
-        error_message = escape_markdown_v2(
-            "❌ *An error occurred*\n\nSorry, something went wrong. Please try again or use /start to return to the main menu."
-        )
-        error_message = error_message.replace("\\*", "*")
-        update.effective_message.reply_text(error_message,
-                                            parse_mode=ParseMode.MARKDOWN_V2)
+        await update.effective_message.reply_text(
+            _ERROR_MSG, parse_mode=ParseMode.MARKDOWN_V2)
       except Exception as e:
         logger.error(f"Failed to send error message to user: {e}")
 
@@ -427,21 +691,39 @@ Ready to discover your next business opportunity?
           "❌ GEMINI_API_KEY environment variable not set! The bot cannot start."
       )
       return
-    if not model:
+    if not client:
       logger.critical(
-          "❌ Gemini AI model failed to initialize. Please check API key and configuration."
+          "❌ Gemini AI client failed to initialize. Please check API key and configuration."
       )
       return
 
-    self.updater = Updater(token=TELEGRAM_BOT_TOKEN, use_context=True)
-    dispatcher = self.updater.dispatcher
-
-    dispatcher.add_handler(CommandHandler("start", self.start))
-    dispatcher.add_handler(CommandHandler("categories", self.show_categories))
-    dispatcher.add_handler(CommandHandler("random", self.random_business_idea))
-    dispatcher.add_handler(CommandHandler("help", self.show_help))
-    dispatcher.add_handler(CallbackQueryHandler(self.callback_query_handler))
-    dispatcher.add_error_handler(self.error_handler)
+    if uvloop:
+      asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+      logger.info("Using uvloop event loop")
+
+    # concurrent_updates lets handlers for different users await Gemini at
+    # the same time instead of being processed one update after another.
+    # AIORateLimiter funnels every outgoing request through a 30 msg/s token
+    # bucket (plus 20 msg/min per group chat). It does not retry by default,
+    # so flood-control 429s are retried explicitly after the wait Telegram
+    # asks for.
+    builder = Application.builder().token(TELEGRAM_BOT_TOKEN)
+    builder.concurrent_updates(True).rate_limiter(
+        AIORateLimiter(max_retries=TELEGRAM_MAX_RETRIES))
+    if orjson:
+      # Every API call returns JSON (e.g. the sent Message, echoing the whole
+      # idea text), so parse it with orjson when available.
+      builder.request(OrjsonHTTPXRequest(connection_pool_size=256))
+      builder.get_updates_request(OrjsonHTTPXRequest())
+    self.application = builder.build()
+    application = self.application
+
+    application.add_handler(CommandHandler("start", self.start))
+    application.add_handler(CommandHandler("categories", self.show_categories))
+    application.add_handler(CommandHandler("random", self.random_business_idea))
+    application.add_handler(CommandHandler("help", self.show_help))
+    application.add_handler(CallbackQueryHandler(self.callback_query_handler))
+    application.add_error_handler(self.error_handler)
 
     # --- DEPLOYMENT LOGIC ---
     # Check if a webhook URL is provided in the environment variables.
@@ -451,19 +733,19 @@ Ready to discover your next business opportunity?
       # Run in webhook mode
       port = int(os.environ.get("PORT", 8443))
       logger.info(f"🚀 Starting bot in webhook mode on port {port}...")
-      self.updater.start_webhook(
+      logger.info(f"✅ Webhook set to {webhook_url}/{TELEGRAM_BOT_TOKEN}")
+      # run_webhook blocks until the bot is stopped.
+      application.run_webhook(
           listen="0.0.0.0",
           port=port,
           url_path=TELEGRAM_BOT_TOKEN,
           webhook_url=f"{webhook_url}/{TELEGRAM_BOT_TOKEN}")
-      logger.info(f"✅ Webhook set to {webhook_url}/{TELEGRAM_BOT_TOKEN}")
     else:
       # Run in polling mode for local development
       logger.info("🚀 Starting bot in polling mode...")
-      self.updater.start_polling()
       logger.info("✅ Bot is running! Press Ctrl+C to stop.")
-
-    self.updater.idle()
+      # run_polling blocks until the bot is stopped.
+      application.run_polling()
 
 
 if __name__ == "__main__":